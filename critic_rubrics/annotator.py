@@ -1,25 +1,166 @@
 """Mixin classes for rubrics functionality."""
 
+import asyncio
+import hashlib
+import io
 import json
+import os
+import random
+import tempfile
 import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from functools import partial
 from pathlib import Path
-from typing import Any, Iterable, Literal, cast
+from typing import Any, Iterable, Literal, cast, overload
 
 import litellm
-from litellm import ChatCompletionRequest, HttpxBinaryResponseContent, OpenAIFileObject, completion
+from litellm import ChatCompletionRequest, HttpxBinaryResponseContent, OpenAIFileObject, acompletion, completion
+from litellm.exceptions import AuthenticationError, BadRequestError, NotFoundError, PermissionDeniedError, RateLimitError
 from litellm.types.utils import LiteLLMBatch, ModelResponse
 
 
 def content_to_dicts(content: HttpxBinaryResponseContent) -> list[dict[str, Any]]:
     """
     Convert HTTP response content to a list of result dictionaries.
+
+    Lines are parsed straight from the raw bytes (`json.loads` accepts bytes), so no decoded
+    copy of the payload or list of lines is built, and only `\n` ends a record.
+    """
+    return [json.loads(line) for line in io.BytesIO(content.read()) if line.strip()]
+
+
+def api_kwargs(base_url: str | None, api_key: str | None) -> dict[str, Any]:
+    """LiteLLM connection kwargs; unset values are left to LiteLLM's own defaults."""
+    kwargs: dict[str, Any] = {}
+    if base_url:
+        kwargs["api_base"] = base_url
+    if api_key:
+        kwargs["api_key"] = api_key
+    return kwargs
+
+
+def response_cache_path(cache_dir: str | Path, payload: dict[str, Any], base_url: str | None = None) -> Path:
     """
-    raw_bytes = content.read()
-    results = []
-    for line in raw_bytes.decode("utf-8").splitlines():
-        if line.strip():
-            results.append(json.loads(line))
-    return results
+    Content-addressed cache location for a completion payload.
+
+    The key covers the whole payload (model, messages, tools, sampling params) and the
+    endpoint, so any prompt, rubric, model or server change maps to a new entry.
+    """
+    key = json.dumps({"api_base": base_url, "payload": payload}, sort_keys=True)
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=20).hexdigest()
+    return Path(cache_dir) / f"{digest}.json"
+
+
+def load_cached_response(cache_file: Path | None) -> ModelResponse | None:
+    if cache_file is None:
+        return None
+    try:
+        return ModelResponse(**json.loads(cache_file.read_text()))
+    except FileNotFoundError:
+        return None
+    except (ValueError, TypeError):
+        # Truncated or otherwise unreadable entry: drop it and treat it as a miss
+        cache_file.unlink(missing_ok=True)
+        return None
+
+
+def store_cached_response(cache_file: Path | None, response: ModelResponse) -> None:
+    if cache_file is None:
+        return
+    cache_file.parent.mkdir(parents=True, exist_ok=True)
+    # Write then rename, so concurrent or interrupted writers never leave a partial entry
+    fd, tmp_file = tempfile.mkstemp(dir=cache_file.parent, suffix=".tmp")
+    with os.fdopen(fd, "w") as f:
+        f.write(response.model_dump_json())
+    os.replace(tmp_file, cache_file)
+
+
+def batch_status(batch: LiteLLMBatch) -> dict[str, Any]:
+    return {
+        "batch_id": batch.id,
+        "status": batch.status,
+        "created_at": batch.created_at,
+        "completed_at": batch.completed_at,
+        "request_counts": batch.request_counts,
+        "error": False
+    }
+
+
+# Errors that will fail the same way on every attempt
+NON_RETRYABLE_ERRORS = (
+    BadRequestError,
+    AuthenticationError,
+    PermissionDeniedError,
+    NotFoundError,
+)
+
+# Upper bound on any single retry wait, including provider-requested ones
+MAX_RETRY_DELAY = 60.0
+
+
+def retry_delay(error: Exception, attempt: int, max_retries: int) -> float | None:
+    """
+    Seconds to wait before retrying after `error`, or None when it should be raised.
+
+    Honors a Retry-After header when the provider sends one, otherwise backs off
+    exponentially with jitter so concurrent callers don't retry in lockstep.
+    Either way the wait is capped at `MAX_RETRY_DELAY` seconds.
+    """
+    if isinstance(error, NON_RETRYABLE_ERRORS) or attempt >= max_retries - 1:
+        return None
+    if isinstance(error, RateLimitError) and error.response is not None:
+        try:
+            retry_after = float(error.response.headers.get("retry-after", ""))
+        except ValueError:
+            pass
+        else:
+            if retry_after >= 0:
+                return min(MAX_RETRY_DELAY, retry_after)
+    return min(MAX_RETRY_DELAY, 2**attempt + random.uniform(0, 1))
+
+
+def supports_cache_control(model: str) -> bool:
+    """Whether the model accepts Anthropic-style `cache_control` content blocks."""
+    return "claude" in model.lower()
+
+
+def apply_model_override(request: ChatCompletionRequest, model: str | None) -> dict[str, Any]:
+    """
+    Copy of `request` sent to `model` instead of the model it was built for.
+
+    The prompt-cache breakpoint on the system message depends on the model, so it is
+    added or stripped to match the final one. The caller's request is left untouched.
+    """
+    body: dict[str, Any] = dict(request)
+    if not model or model == body.get("model"):
+        return body
+    body["model"] = model
+
+    messages: list[dict[str, Any]] = []
+    for message in body.get("messages", []):
+        content = message.get("content")
+        if message.get("role") == "system" and isinstance(content, list) and content:
+            last_block = dict(content[-1])
+            if supports_cache_control(model):
+                last_block["cache_control"] = {"type": "ephemeral"}
+            else:
+                last_block.pop("cache_control", None)
+            message = {**message, "content": [*content[:-1], last_block]}
+        messages.append(message)
+    body["messages"] = messages
+    return body
+
+
+def prepare_annotation(
+    request: ChatCompletionRequest,
+    model: str | None,
+    base_url: str | None,
+    cache_dir: str | Path | None,
+) -> tuple[dict[str, Any], Path | None]:
+    """Completion payload for `request` (with the model override applied) and its cache file, if caching."""
+    payload = apply_model_override(request, model)
+    cache_file = response_cache_path(cache_dir, payload, base_url) if cache_dir else None
+    return payload, cache_file
 
 
 class Annotator:
@@ -33,29 +174,101 @@ class Annotator:
         base_url: str | None = None,
         api_key: str | None = None,
         max_retries: int = 3,
+        cache_dir: str | Path | None = None,
     ) -> ModelResponse:
-        """Send a single request to LiteLLM."""
-        payload = dict(request)
-        if model:  # override model if provided
-            payload["model"] = model
+        """Send a single request to LiteLLM. With `cache_dir`, identical payloads are answered from disk."""
+        payload, cache_file = prepare_annotation(request, model, base_url, cache_dir)
+        cached = load_cached_response(cache_file)
+        if cached is not None:
+            return cached
 
-        kwargs = {}
-        if base_url:
-            kwargs["api_base"] = base_url
-        if api_key:
-            kwargs["api_key"] = api_key
+        kwargs = api_kwargs(base_url, api_key)
 
         for attempt in range(max_retries):
             try:
                 response = completion(**payload, **kwargs)
+            except Exception as e:
+                delay = retry_delay(e, attempt, max_retries)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+            else:
                 response = cast(ModelResponse, response)
+                store_cached_response(cache_file, response)
                 return response
-            except Exception:
-                if attempt == max_retries - 1:
+        raise RuntimeError("Unreachable")
+
+    @staticmethod
+    def annotate_many(
+        requests: Iterable[ChatCompletionRequest],
+        *,
+        model: str | None = None,
+        base_url: str | None = None,
+        api_key: str | None = None,
+        max_retries: int = 3,
+        max_workers: int = 8,
+        cache_dir: str | Path | None = None,
+    ) -> list[ModelResponse]:
+        """Send independent requests concurrently. Responses are returned in input order."""
+        annotate = partial(Annotator.annotate, model=model, base_url=base_url, api_key=api_key, max_retries=max_retries, cache_dir=cache_dir)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(annotate, requests))
+
+    @staticmethod
+    async def aannotate(
+        request: ChatCompletionRequest,
+        *,
+        model: str | None = None,
+        base_url: str | None = None,
+        api_key: str | None = None,
+        max_retries: int = 3,
+        cache_dir: str | Path | None = None,
+    ) -> ModelResponse:
+        """Async version of `annotate`."""
+        payload, cache_file = prepare_annotation(request, model, base_url, cache_dir)
+        cached = load_cached_response(cache_file)
+        if cached is not None:
+            return cached
+
+        kwargs = api_kwargs(base_url, api_key)
+
+        for attempt in range(max_retries):
+            try:
+                response = await acompletion(**payload, **kwargs)
+            except Exception as e:
+                delay = retry_delay(e, attempt, max_retries)
+                if delay is None:
                     raise
-                time.sleep(2**attempt)  # exponential backoff
+                await asyncio.sleep(delay)
+            else:
+                response = cast(ModelResponse, response)
+                store_cached_response(cache_file, response)
+                return response
         raise RuntimeError("Unreachable")
 
+    @staticmethod
+    async def aannotate_many(
+        requests: Iterable[ChatCompletionRequest],
+        *,
+        model: str | None = None,
+        base_url: str | None = None,
+        api_key: str | None = None,
+        max_retries: int = 3,
+        concurrency: int = 16,
+        cache_dir: str | Path | None = None,
+    ) -> list[ModelResponse]:
+        """Send independent requests on the event loop, at most `concurrency` in flight.
+
+        Responses are returned in input order.
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def annotate_one(request: ChatCompletionRequest) -> ModelResponse:
+            async with semaphore:
+                return await Annotator.aannotate(request, model=model, base_url=base_url, api_key=api_key, max_retries=max_retries, cache_dir=cache_dir)
+
+        return await asyncio.gather(*(annotate_one(request) for request in requests))
+
     @staticmethod
     def batch_annotate(
         requests: Iterable[ChatCompletionRequest],
@@ -70,39 +283,53 @@ class Annotator:
         max_requests: int = 50_000,
         max_bytes: int = 200 * 1024 * 1024,
         delete_after_upload: bool = True,
+        max_concurrent_uploads: int = 4,
     ) -> list[str]:
-        """Send batch requests to LiteLLM. Returns list of batch IDs."""
+        """Send batch requests to LiteLLM. Returns list of batch IDs.
+
+        Re-running over the same `output_dir` and requests reuses batches that were already
+        submitted (matched by a digest of their input lines) instead of uploading them again.
+        Up to `max_concurrent_uploads` batches are uploaded concurrently; IDs are returned in batch order.
+        """
         output_dir = Path(output_dir)
         output_dir.mkdir(parents=True, exist_ok=True)
 
-        kwargs = {}
-        if base_url:
-            kwargs["api_base"] = base_url
-        if api_key:
-            kwargs["api_key"] = api_key
+        kwargs = api_kwargs(base_url, api_key)
 
-        batch_ids = []
-        current_batch = []
+        current_batch: list[bytes] = []
         current_size = 0
         batch_num = 0
 
-        def flush_batch():
-            nonlocal batch_num, current_batch, current_size
-            if not current_batch:
-                return
+        def submit_batch(batch_num: int, lines: list[bytes]) -> str:
+            batch_file = output_dir / f"batch_{batch_num:06d}.json"
+            # Batches are only reused for the same inputs sent to the same provider and endpoint
+            digest = hashlib.blake2b(json.dumps([custom_llm_provider, base_url]).encode("utf-8"), digest_size=20)
+            for line in lines:
+                digest.update(line)
+            input_digest = digest.hexdigest()
+
+            # Resume: an identical batch was already submitted by a previous run
+            if batch_file.exists():
+                batch_info = json.loads(batch_file.read_text())
+                if batch_info.get("input_digest") == input_digest and batch_info.get("custom_llm_provider") == custom_llm_provider:
+                    print(f"  Skipping batch {batch_num}, already submitted as {batch_info['batch_id']}")
+                    return batch_info["batch_id"]
 
             batch_input_file = output_dir / f"batch_{batch_num:06d}_inputs.jsonl"
-            with open(batch_input_file, "w") as f:
-                for line in current_batch:
-                    f.write(line + "\n")
-                print(f"  Flushing batch {batch_num} with {len(current_batch)} requests to {batch_input_file}...")
-
-            with open(batch_input_file, "rb") as f:
-                file_obj = litellm.create_file(file=f, purpose="batch", custom_llm_provider=custom_llm_provider, **kwargs)
-                file_obj = cast(OpenAIFileObject, file_obj)
-
             if delete_after_upload:
-                batch_input_file.unlink()
+                # The input file would only be deleted again, so upload straight from memory
+                print(f"  Flushing batch {batch_num} with {len(lines)} requests...")
+                file_obj = litellm.create_file(
+                    file=(batch_input_file.name, b"".join(lines)), purpose="batch", custom_llm_provider=custom_llm_provider, **kwargs
+                )
+            else:
+                with open(batch_input_file, "wb") as f:
+                    f.writelines(lines)
+                    print(f"  Flushing batch {batch_num} with {len(lines)} requests to {batch_input_file}...")
+
+                with open(batch_input_file, "rb") as f:
+                    file_obj = litellm.create_file(file=f, purpose="batch", custom_llm_provider=custom_llm_provider, **kwargs)
+            file_obj = cast(OpenAIFileObject, file_obj)
 
             # Create batch
             batch = litellm.create_batch(
@@ -120,49 +347,73 @@ class Annotator:
                 "batch_id": batch.id,
                 "input_file_id": file_obj.id,
                 "created_at": time.time(),
-                "request_count": len(current_batch),
+                "request_count": len(lines),
                 "custom_llm_provider": custom_llm_provider,
+                "input_digest": input_digest,
             }
 
-            batch_file = output_dir / f"batch_{batch_num:06d}.json"
-            batch_file.write_text(json.dumps(batch_info, indent=2))
+            # Write then rename, so an interrupted run never leaves a truncated sidecar to resume from
+            tmp_file = batch_file.with_suffix(".json.tmp")
+            tmp_file.write_text(json.dumps(batch_info, indent=2))
+            os.replace(tmp_file, batch_file)
+            return batch.id
+
+        futures: list[Future[str]] = []
+
+        def flush_batch():
+            nonlocal batch_num, current_batch, current_size
+            if not current_batch:
+                return
 
-            batch_ids.append(batch.id)
+            # Each in-flight batch holds up to max_bytes of lines, so bound how many are pending
+            pending = [future for future in futures if not future.done()]
+            if len(pending) >= max_concurrent_uploads:
+                wait(pending, return_when=FIRST_COMPLETED)
+            for future in futures:
+                if future.done():
+                    future.result()  # surface upload errors before assembling more batches
+
+            futures.append(executor.submit(submit_batch, batch_num, current_batch))
             batch_num += 1
             current_batch = []
             current_size = 0
 
-        # Process requests
-        for i, request in enumerate(requests):
-            body = dict(request)
-            if model:  # always override model if provided
-                body["model"] = model
-
-            custom_id = f"req_{output_dir.name}_{i:08d}"
-            if "metadata" in body and isinstance(body["metadata"], dict):
-                custom_id = body["metadata"].get("custom_request_id", custom_id)
-                body.pop("metadata")  # remove so it don't cause issues with LLM completions
-
-            line_obj = {
-                "custom_id": custom_id,
-                "method": "POST",
-                "url": endpoint,
-                "body": body,
-            }
-            line = json.dumps(line_obj, separators=(",", ":"))
-            line_size = len(line.encode("utf-8"))
+        custom_id_prefix = f"req_{output_dir.name}_"
+
+        # Batches are uploaded in the background while the next one is assembled
+        with ThreadPoolExecutor(max_workers=max_concurrent_uploads) as executor:
+            # Process requests
+            for i, request in enumerate(requests):
+                body = apply_model_override(request, model)
 
-            # Check if we need to flush
-            if current_batch and (len(current_batch) >= max_requests or current_size + line_size > max_bytes):
-                flush_batch()
+                custom_id = None
+                metadata = body.get("metadata")
+                if isinstance(metadata, dict):
+                    custom_id = metadata.get("custom_request_id")
+                    body.pop("metadata")  # remove so it don't cause issues with LLM completions
+                if custom_id is None:
+                    custom_id = f"{custom_id_prefix}{i:08d}"
 
-            current_batch.append(line)
-            current_size += line_size
+                line_obj = {
+                    "custom_id": custom_id,
+                    "method": "POST",
+                    "url": endpoint,
+                    "body": body,
+                }
+                line = json.dumps(line_obj, separators=(",", ":")).encode("utf-8") + b"\n"  # encode once: sized and written as-is
+                line_size = len(line)
 
-        # Flush remaining
-        flush_batch()
+                # Check if we need to flush
+                if current_batch and (len(current_batch) >= max_requests or current_size + line_size > max_bytes):
+                    flush_batch()
 
-        return batch_ids
+                current_batch.append(line)
+                current_size += line_size
+
+            # Flush remaining
+            flush_batch()
+
+        return [future.result() for future in futures]
 
     @staticmethod
     def get_batch_results(
@@ -173,23 +424,12 @@ class Annotator:
         api_key: str | None = None,
     ) -> tuple[dict[str, Any], list[dict[str, Any]], list[dict[str, Any]] | None]:
         """Get batch status and results if ready."""
-        kwargs = {}
-        if base_url:
-            kwargs["api_base"] = base_url
-        if api_key:
-            kwargs["api_key"] = api_key
+        kwargs = api_kwargs(base_url, api_key)
 
         # Get batch status
         batch = litellm.retrieve_batch(batch_id=batch_id, custom_llm_provider=custom_llm_provider, **kwargs)
         batch = cast(LiteLLMBatch, batch)
-        status = {
-            "batch_id": batch.id,
-            "status": batch.status,
-            "created_at": batch.created_at,
-            "completed_at": batch.completed_at,
-            "request_counts": batch.request_counts,
-            "error": False
-        }
+        status = batch_status(batch)
 
         # If not complete, return status only
         if batch.status != "completed":
@@ -210,3 +450,57 @@ class Annotator:
         content = cast(HttpxBinaryResponseContent, content)
 
         return status, content_to_dicts(content), error_content
+
+    @overload
+    @staticmethod
+    async def aget_batch_results(
+        batch_ids: Iterable[str],
+        custom_llm_provider: Literal["openai", "azure", "vertex_ai"],
+        *,
+        base_url: str | None = None,
+        api_key: str | None = None,
+        concurrency: int = 4,
+        return_exceptions: Literal[False] = False,
+    ) -> list[tuple[dict[str, Any], list[dict[str, Any]], list[dict[str, Any]] | None]]: ...
+
+    @overload
+    @staticmethod
+    async def aget_batch_results(
+        batch_ids: Iterable[str],
+        custom_llm_provider: Literal["openai", "azure", "vertex_ai"],
+        *,
+        base_url: str | None = None,
+        api_key: str | None = None,
+        concurrency: int = 4,
+        return_exceptions: Literal[True],
+    ) -> list[tuple[dict[str, Any], list[dict[str, Any]], list[dict[str, Any]] | None] | BaseException]: ...
+
+    @staticmethod
+    async def aget_batch_results(
+        batch_ids: Iterable[str],
+        custom_llm_provider: Literal["openai", "azure", "vertex_ai"],
+        *,
+        base_url: str | None = None,
+        api_key: str | None = None,
+        concurrency: int = 4,
+        return_exceptions: bool = False,
+    ) -> (
+        list[tuple[dict[str, Any], list[dict[str, Any]], list[dict[str, Any]] | None]]
+        | list[tuple[dict[str, Any], list[dict[str, Any]], list[dict[str, Any]] | None] | BaseException]
+    ):
+        """Run `get_batch_results` for many batches, at most `concurrency` at a time.
+
+        Results are returned in input order and are all held in memory until the last batch is done,
+        so keep `concurrency` and the number of batch ids per call small for large outputs.
+        With `return_exceptions`, a failing batch yields its exception instead of cancelling the others.
+        """
+        if concurrency < 1:
+            raise ValueError(f"concurrency must be at least 1, got {concurrency}")
+        semaphore = asyncio.Semaphore(concurrency)
+        get_results = partial(Annotator.get_batch_results, custom_llm_provider=custom_llm_provider, base_url=base_url, api_key=api_key)
+
+        async def get_one(batch_id: str) -> tuple[dict[str, Any], list[dict[str, Any]], list[dict[str, Any]] | None]:
+            async with semaphore:
+                return await asyncio.to_thread(get_results, batch_id)
+
+        return await asyncio.gather(*(get_one(batch_id) for batch_id in batch_ids), return_exceptions=return_exceptions)
@@ -1,7 +1,8 @@
 import json
 import logging
 from abc import abstractmethod
-from typing import Any
+from functools import cached_property
+from typing import Any, Mapping, Self, cast
 
 from litellm import ChatCompletionRequest, ChatCompletionToolChoiceObjectParam, ChatCompletionToolParam
 from litellm.types.utils import ChatCompletionMessageToolCall
@@ -37,21 +38,44 @@ class BaseRubrics(BaseModel):
     system_message: str
     user_message: str | None = None  # Optional
     required_all: bool = True
+    include_rationale: bool = True  # False asks for labels only; parsed rationales default to ""
     rationale_description: str = "Brief evidence/quote (<=25 words) explaining why."
 
+    # Cached schema properties live in __dict__ and must follow changes to the definition
+    def __setattr__(self, name: str, value: Any) -> None:
+        super().__setattr__(name, value)
+        self._clear_cached_properties()
+
+    def model_copy(self, *, update: Mapping[str, Any] | None = None, deep: bool = False) -> Self:
+        copied = super().model_copy(update=update, deep=deep)
+        copied._clear_cached_properties()
+        return copied
+
+    def _clear_cached_properties(self) -> None:
+        cached = cast(dict[str, Any], self.__dict__)
+        for cls in type(self).__mro__:
+            for name, attr in vars(cls).items():
+                if isinstance(attr, cached_property):
+                    cached.pop(name, None)
+
     # ============================================================
     # LLM tool schema generation
     # ============================================================
 
-    @property
+    @cached_property
     def tool_choice(self) -> ChatCompletionToolChoiceObjectParam:
         return ChatCompletionToolChoiceObjectParam(
             type="function",
             function={"name": self.tool_name},
         )
 
-    @property
+    @cached_property
     def tools(self) -> list[ChatCompletionToolParam]:
+        """Tool schema for this rubric, built once per instance.
+
+        The schema only depends on the rubric definition, so every request shares
+        the same object. Treat it as read-only.
+        """
         props: dict[str, Any] = {}
 
         for feature in self.features:
@@ -68,15 +92,18 @@ class BaseRubrics(BaseModel):
             field_desc = feature.description.strip()
 
             try:
-                props.update(
-                    prediction_type.to_tool_properties(
-                        field_name=name,
-                        field_description=field_desc,
-                        rationale_description=self.rationale_description,
-                    )
+                feature_props = prediction_type.to_tool_properties(
+                    field_name=name,
+                    field_description=field_desc,
+                    rationale_description=self.rationale_description,
                 )
             except Exception as e:
                 logger.exception("Failed building tool properties for %s: %s", name, e)
+                continue
+
+            if not self.include_rationale:
+                feature_props.pop(f"{name}_rationale", None)
+            props.update(feature_props)
 
         required = sorted(props.keys()) if self.required_all else []
 
@@ -91,6 +118,11 @@ class BaseRubrics(BaseModel):
             }
         ]
 
+    @cached_property
+    def tool_property_names(self) -> frozenset[str]:
+        """Names of all flattened tool arguments declared by this rubric."""
+        return frozenset(self.tools[0]["function"]["parameters"]["properties"])  # type: ignore
+
     # ============================================================
     # Annotation message generation for LLM
     # ============================================================
@@ -156,7 +188,4 @@ class BaseRubrics(BaseModel):
         if function_name != self.tool_name:
             return False
         tool_args = extract_tool_args(tool_call)
-        tool_args_set = set(tool_args.keys())
-        current_arg_sets = set(self.tools[0]['function']['parameters']["properties"].keys()) # type: ignore
-
-        return tool_args_set == current_arg_sets
+        return tool_args.keys() == self.tool_property_names
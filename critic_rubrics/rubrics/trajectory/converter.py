@@ -122,9 +122,11 @@ def transform_for_annotator(
     payload: Dict[str, Any],
     system_message: str,
     annotation_instruction_message: str,
+    cache_system_message: bool = False,
 ) -> list[LiteLLMMessageType] | None:
     """
     - Prepend a synthetic system message (new_system_block + original system + tools description).
+      With cache_system_message, mark it as an ephemeral prompt-cache breakpoint (Anthropic-style).
     - Keep every message as-is, EXCEPT:
         * assistant with tool_calls: append convert_tool_call_to_string(...) AFTER original content (prefix retained)
         * tool role messages: convert to user, prefix with "EXECUTION RESULT of [name]:\n", keep original content
@@ -160,7 +162,11 @@ def transform_for_annotator(
     messages = [m for m in messages if m.get("role") != "system"]
 
     # build the synthetic system meta message
-    transformed: list[LiteLLMMessageType] = [ChatCompletionSystemMessage(role="system", content=[{"type": "text", "text": system_message}])]
+    system_block: ChatCompletionTextObject = {"type": "text", "text": system_message}
+    if cache_system_message:
+        # The rubric system message is identical across requests: cache it together with the tools
+        system_block["cache_control"] = {"type": "ephemeral"}
+    transformed: list[LiteLLMMessageType] = [ChatCompletionSystemMessage(role="system", content=[system_block])]
 
     # Filter initial empty assistant messages
     # {'content': [{'type': 'text', 'text': ''}], 'role': 'assistant'}
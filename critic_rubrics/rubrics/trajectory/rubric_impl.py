@@ -2,6 +2,7 @@ from typing import Any
 
 from litellm import ChatCompletionRequest
 
+from ...annotator import supports_cache_control
 from ..base import BaseRubrics
 from .converter import transform_for_annotator
 
@@ -17,6 +18,7 @@ class AnnotateConversationRubric(BaseRubrics):
             inputs,
             system_message=self.system_message,
             annotation_instruction_message=self.user_message,
+            cache_system_message=supports_cache_control(model),
         )
         if messages is None:
             return None
@@ -25,7 +25,7 @@ def open_shard_fn(path: Path):
     return path.open("r", encoding="utf-8")
 
 
-def generate_requests_from_traces(trace_dir: Path, pattern: str, limit: int | None = None):
+def generate_requests_from_traces(trace_dir: Path, pattern: str, model: str, limit: int | None = None):
     """Generate annotation requests from trace files."""
     shards = sorted(trace_dir.glob(pattern))
     if not shards:
@@ -54,7 +54,8 @@ def generate_requests_from_traces(trace_dir: Path, pattern: str, limit: int | No
                     inputs={
                         "messages": messages,
                         "tools": trace_segment["tools"],
-                    }
+                    },
+                    model=model,
                 )
                 if annotation_request is None:
                     rich.print(f"[yellow]Skipping {conversation_id}/{segment_id} (no tools)[/yellow]")
@@ -162,7 +163,7 @@ def main():
         rich.print(f"[bold red]Trace directory not found: {trace_dir}[/bold red]")
         return 1
 
-    requests = generate_requests_from_traces(trace_dir, args.pattern, args.limit)
+    requests = generate_requests_from_traces(trace_dir, args.pattern, args.model, args.limit)
     # Send batches
     rich.print("[bold green]Sending requests to LiteLLM batch API...[/bold green]")
     rich.print(f"  Output directory: {args.output_dir}")
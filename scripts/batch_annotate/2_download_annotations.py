@@ -5,8 +5,10 @@ Checks batch status and downloads completed results.
 """
 
 import argparse
+import asyncio
 import json
 import os
+import random
 import time
 from pathlib import Path
 
@@ -31,6 +33,20 @@ def load_batch_info(batch_dir: Path):
     return batches
 
 
+def check_group(group: list[tuple[str, str]], args: argparse.Namespace, api_key: str):
+    """Fetch status and results for one group of (batch_id, batch_name) pairs concurrently, in group order."""
+    return asyncio.run(
+        Annotator.aget_batch_results(
+            [batch_id for batch_id, _ in group],
+            custom_llm_provider=args.model_provider,
+            base_url=args.base_url,
+            api_key=api_key,
+            concurrency=args.concurrency,
+            return_exceptions=True,
+        )
+    )
+
+
 def main():
     parser = argparse.ArgumentParser(description="Download annotation results from LiteLLM batch API")
 
@@ -69,6 +85,13 @@ def main():
         help="API key for LiteLLM proxy (or use LITELLM_API_KEY env var)",
     )
 
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=4,
+        help="Number of batches checked and downloaded at the same time (default: 4)",
+    )
+
     # Polling options
     parser.add_argument(
         "--poll",
@@ -79,7 +102,13 @@ def main():
         "--poll-interval",
         type=int,
         default=2,
-        help="Polling interval in seconds (default: 2)",
+        help="Initial polling interval in seconds (default: 2)",
+    )
+    parser.add_argument(
+        "--max-poll-interval",
+        type=int,
+        default=300,
+        help="Polling interval cap in seconds; the interval doubles after each check (default: 300)",
     )
 
     args = parser.parse_args()
@@ -90,6 +119,10 @@ def main():
         rich.print("[bold red]Error: API key required (--api-key or LITELLM_API_KEY env var)[/bold red]")
         return 1
 
+    if args.concurrency < 1:
+        rich.print(f"[bold red]Error: --concurrency must be at least 1, got {args.concurrency}[/bold red]")
+        return 1
+
     # Determine batch IDs to process
     batch_ids = []
     output_dir = batch_dir = Path(args.batch_dir)
@@ -125,65 +158,75 @@ def main():
             # Check status of all pending batches
             still_pending = []
 
-            for batch_id, batch_name in pending_batches:
-                task = progress.add_task(f"Checking {batch_name}...", total=None)
-
-                try:
-                    status, results, error_results = Annotator.get_batch_results(
-                        batch_id,
-                        custom_llm_provider=args.model_provider,
-                        base_url=args.base_url,
-                        api_key=api_key,
-                    )
-
-                    if status["status"] == "completed":
-                        # Save results
-                        if error_results:
-                            error_file = output_dir / f"{batch_name}_errors.jsonl"
-                            with error_file.open("w") as f:
-                                for error in error_results:
-                                    f.write(json.dumps(error) + "\n")
-                            msg = f"✗ {batch_name} - {len(results)} errors saved to {error_file}"
+            # Query batches concurrently in groups of --concurrency; each group's results are
+            # written out before the next is fetched, so at most that many outputs are held in memory
+            for start in range(0, len(pending_batches), args.concurrency):
+                group = pending_batches[start : start + args.concurrency]
+                tasks = [progress.add_task(f"Checking {batch_name}...", total=None) for _, batch_name in group]
+                outcomes = check_group(group, args, api_key)
+
+                for (batch_id, batch_name), task, outcome in zip(group, tasks, outcomes):
+                    if isinstance(outcome, BaseException) and not isinstance(outcome, Exception):
+                        raise outcome  # cancellation and interrupts abort the run, not just this batch
+
+                    try:
+                        if isinstance(outcome, Exception):
+                            raise outcome
+                        status, results, error_results = outcome
+
+                        if status["status"] == "completed":
+                            # Save results
+                            if error_results:
+                                error_file = output_dir / f"{batch_name}_errors.jsonl"
+                                with error_file.open("w") as f:
+                                    for error in error_results:
+                                        f.write(json.dumps(error) + "\n")
+                                msg = f"✗ {batch_name} - {len(results)} errors saved to {error_file}"
+                                progress.update(task, description=f"[red]{msg}")
+                                progress_log.append(f"[red]{msg}[/red]")
+
+                            # Save outputs
+                            output_file = output_dir / f"{batch_name}_outputs.jsonl"
+                            with output_file.open("w") as f:
+                                for result in results:
+                                    f.write(json.dumps(result) + "\n")
+                            msg = f"✓ {batch_name} - {len(results)} results saved to {output_file}"
+                            progress.update(task, description=f"[green]{msg}")
+                            progress_log.append(f"[green]{msg}[/green]")
+
+                            completed_batches.append((batch_id, batch_name, len(results)))
+
+                        elif status["status"] in ["failed", "expired", "cancelled"]:
+                            failed_batches.append((batch_id, batch_name, status["status"]))
+                            msg = f"✗ {batch_name} - {status['status']}"
                             progress.update(task, description=f"[red]{msg}")
                             progress_log.append(f"[red]{msg}[/red]")
 
-                        # Save outputs
-                        output_file = output_dir / f"{batch_name}_outputs.jsonl"
-                        with output_file.open("w") as f:
-                            for result in results:
-                                f.write(json.dumps(result) + "\n")
-                        msg = f"✓ {batch_name} - {len(results)} results saved to {output_file}"
-                        progress.update(task, description=f"[green]{msg}")
-                        progress_log.append(f"[green]{msg}[/green]")
-
-                        completed_batches.append((batch_id, batch_name, len(results)))
+                        else:
+                            still_pending.append((batch_id, batch_name))
+                            msg = f"⏳ {batch_name} - {status['status']}"
+                            progress.update(task, description=f"[yellow]{msg}")
+                            progress_log.append(f"[yellow]{msg}[/yellow]")
 
-                    elif status["status"] in ["failed", "expired", "cancelled"]:
-                        failed_batches.append((batch_id, batch_name, status["status"]))
-                        msg = f"✗ {batch_name} - {status['status']}"
+                    except Exception as e:
+                        failed_batches.append((batch_id, batch_name, str(e)))
+                        msg = f"✗ {batch_name} - Error: {e}"
                         progress.update(task, description=f"[red]{msg}")
                         progress_log.append(f"[red]{msg}[/red]")
 
-                    else:
-                        still_pending.append((batch_id, batch_name))
-                        msg = f"⏳ {batch_name} - {status['status']}"
-                        progress.update(task, description=f"[yellow]{msg}")
-                        progress_log.append(f"[yellow]{msg}[/yellow]")
-
-                except Exception as e:
-                    failed_batches.append((batch_id, batch_name, str(e)))
-                    msg = f"✗ {batch_name} - Error: {e}"
-                    progress.update(task, description=f"[red]{msg}")
-                    progress_log.append(f"[red]{msg}[/red]")
+                    progress.remove_task(task)
 
-                progress.remove_task(task)
+                del outcomes  # release this group's results before fetching the next
 
             pending_batches = still_pending
 
             if pending_batches and args.poll:
-                wait_task = progress.add_task(f"Waiting {poll_interval}s before next check...", total=None)
-                time.sleep(poll_interval)
+                # Exponential backoff with jitter: batches take minutes to hours
+                wait = poll_interval * random.uniform(0.8, 1.2)
+                wait_task = progress.add_task(f"Waiting {wait:.0f}s before next check...", total=None)
+                time.sleep(wait)
                 progress.remove_task(wait_task)
+                poll_interval = min(poll_interval * 2, args.max_poll_interval)
             else:
                 break
 
@@ -7,6 +7,7 @@ Usage: python 3_consolidate_and_convert_outputs.py <batch_folder>
 
 import argparse
 import json
+import os
 import sys
 from pathlib import Path
 from typing import Any, Dict, Generator, Iterator
@@ -32,26 +33,25 @@ def load_batch_data(batch_folder: Path) -> Generator[Dict[str, Any], None, None]
                 if not line:
                     continue
                 
+                # Extract tool calls path: response.body.choices[0].message.tool_calls
+                # Failed requests carry a non-200 status or "response": null
                 try:
                     output = json.loads(line)
-                    
-                    # Extract tool calls path: response.body.choices[0].message.tool_calls
-                    response = output.get("response", {})
-                    if response.get("status_code") != 200:
+                    response = output["response"]
+                    if response["status_code"] != 200:
                         continue
-                    
-                    body = response.get("body", {})
-                    yield {
-                        "batch_id": output.get("id", "unknown"),
-                        "custom_id": output.get("custom_id", "unknown"),
-                        "response": body,
-                        "usage": body.get("usage", {}),
-                        "model": body.get("model", "unknown")
-                    }
-                    
-                except json.JSONDecodeError:
+                    body = response["body"]
+                except (json.JSONDecodeError, KeyError, TypeError):
                     continue
 
+                yield {
+                    "batch_id": output.get("id", "unknown"),
+                    "custom_id": output.get("custom_id", "unknown"),
+                    "response": body,
+                    "usage": body.get("usage", {}),
+                    "model": body.get("model", "unknown")
+                }
+
 def process_batch_data(batch_folder: Path) -> Iterator[Dict[str, Any]]:
     """Process batch data and convert to feature data."""
     for data in load_batch_data(batch_folder):
@@ -96,29 +96,34 @@ def main():
         print(f"Error: {args.batch_folder} is not a directory")
         sys.exit(1)
     
-    # Process data and collect results
-    results = list(process_batch_data(args.batch_folder))
-    if not results:
-        print("No results processed")
-        sys.exit(1)
-    
-    # Save results
+    # Process data, save results and tally the summary in a single pass. Results go to a temp
+    # file that only replaces the output once complete, so an empty or failed run keeps the old one.
     output_file = args.batch_folder / args.output_name
-    with open(output_file, 'w', encoding='utf-8') as f:
-        for result in results:
-            json.dump(result, f, ensure_ascii=False)
-            f.write('\n')
-    
-    # Print summary
-    total_features = sum(r["feature_count"] for r in results)
+    tmp_file = output_file.with_name(f"{output_file.name}.tmp")
+    n_results = 0
+    total_features = 0
     feature_types = {}
-    for result in results:
-        for feature_data in result["features"].values():
-            feature_type = feature_data["type"]
-            feature_types[feature_type] = feature_types.get(feature_type, 0) + 1
+    try:
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            for result in process_batch_data(args.batch_folder):
+                json.dump(result, f, ensure_ascii=False)
+                f.write('\n')
+                n_results += 1
+                total_features += result["feature_count"]
+                for feature_data in result["features"].values():
+                    feature_type = feature_data["type"]
+                    feature_types[feature_type] = feature_types.get(feature_type, 0) + 1
+
+        if not n_results:
+            print("No results processed")
+            sys.exit(1)
+        os.replace(tmp_file, output_file)
+    finally:
+        tmp_file.unlink(missing_ok=True)
     
-    print(f"\n✅ Saved {len(results)} results to {output_file}")
-    print(f"Total features: {total_features} (avg: {total_features/len(results):.1f})")
+    # Print summary
+    print(f"\n✅ Saved {n_results} results to {output_file}")
+    print(f"Total features: {total_features} (avg: {total_features/n_results:.1f})")
     print("Feature types:", ", ".join(f"{k}: {v}" for k, v in sorted(feature_types.items())))
 
 
@@ -0,0 +1,44 @@
+import copy
+import json
+
+from critic_rubrics.prediction import BinaryPrediction
+from critic_rubrics.rubrics.trajectory import annotate_conversation_rubrics
+
+
+def test_tools_schema_is_built_once():
+    tools = annotate_conversation_rubrics.tools
+    assert annotate_conversation_rubrics.tools is tools
+    assert annotate_conversation_rubrics.tool_choice is annotate_conversation_rubrics.tool_choice
+
+    props = tools[0]["function"]["parameters"]["properties"]  # type: ignore
+    assert "misunderstood_intention_detected" in props
+    assert "misunderstood_intention_rationale" in props
+
+
+def test_tools_schema_follows_definition_changes():
+    copied = annotate_conversation_rubrics.model_copy(update={"tool_name": "copied"})
+    assert copied.tools[0]["function"]["name"] == "copied"
+
+    rubric = copy.deepcopy(annotate_conversation_rubrics)
+    assert rubric.tools[0]["function"]["name"] == annotate_conversation_rubrics.tool_name
+    rubric.tool_name = "renamed"
+    assert rubric.tools[0]["function"]["name"] == "renamed"
+    assert annotate_conversation_rubrics.tools[0]["function"]["name"] != "renamed"
+
+
+def test_labels_only_schema_drops_rationales():
+    rubric = annotate_conversation_rubrics.model_copy(update={"include_rationale": False, "tool_name": "labels_only"})
+    assert rubric.tool_choice["function"]["name"] == "labels_only"
+    props = rubric.tools[0]["function"]["parameters"]["properties"]  # type: ignore
+    assert "misunderstood_intention_detected" in props
+    assert "task_type" in props
+    assert not any(name.endswith("_rationale") for name in props)
+
+    tool_call = {
+        "id": "call_0",
+        "type": "function",
+        "function": {"name": rubric.tool_name, "arguments": json.dumps({"misunderstood_intention_detected": True, "task_type": "Fix Bugs"})},
+    }
+    predictions = {fd.feature.name: fd.prediction for fd in rubric.tool_call_to_feature_data(tool_call)}  # type: ignore
+    assert predictions["misunderstood_intention"] == BinaryPrediction(detected=True, rationale="")
+    assert predictions["task_type"].rationale == ""  # type: ignore
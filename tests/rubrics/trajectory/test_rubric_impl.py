@@ -0,0 +1,29 @@
+from typing import Any, cast
+
+from critic_rubrics.rubrics.trajectory import annotate_conversation_rubrics
+
+
+INPUTS = {
+    "messages": [
+        {"role": "system", "content": "You are a helpful agent."},
+        {"role": "user", "content": "Fix the bug."},
+        {"role": "assistant", "content": "Done."},
+    ],
+    "tools": [],
+}
+
+
+def test_system_message_cached_for_claude_models():
+    request = annotate_conversation_rubrics.create_annotation_request(INPUTS, model="anthropic/claude-sonnet-4-20250514")
+    assert request is not None
+    system_message = cast(dict[str, Any], request["messages"][0])
+    system_block = system_message["content"][0]
+    assert system_block["cache_control"] == {"type": "ephemeral"}
+
+
+def test_system_message_not_cached_for_other_models():
+    request = annotate_conversation_rubrics.create_annotation_request(INPUTS, model="openai/o3-2025-04-16")
+    assert request is not None
+    system_message = cast(dict[str, Any], request["messages"][0])
+    system_block = system_message["content"][0]
+    assert "cache_control" not in system_block
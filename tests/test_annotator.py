@@ -0,0 +1,266 @@
+import asyncio
+import json
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+
+import httpx
+import pytest
+from litellm import ChatCompletionRequest, HttpxBinaryResponseContent
+from litellm.exceptions import BadRequestError, RateLimitError
+from litellm.types.utils import ModelResponse
+
+import critic_rubrics.annotator as annotator_module
+from critic_rubrics import Annotator
+from critic_rubrics.annotator import content_to_dicts, retry_delay
+
+
+def _request(i: int) -> ChatCompletionRequest:
+    return ChatCompletionRequest(model="openai/test", messages=[{"role": "user", "content": str(i)}])
+
+
+def test_annotate_many_keeps_input_order(monkeypatch: pytest.MonkeyPatch):
+    def fake_completion(**payload: Any) -> str:
+        return payload["messages"][0]["content"] + payload["model"]
+
+    monkeypatch.setattr(annotator_module, "completion", fake_completion)
+    responses = Annotator.annotate_many([_request(i) for i in range(20)], model="m", max_workers=4)
+    assert responses == [f"{i}m" for i in range(20)]
+
+
+def test_aannotate_many_bounds_concurrency(monkeypatch: pytest.MonkeyPatch):
+    in_flight = 0
+    peak = 0
+
+    async def fake_acompletion(**payload: Any) -> str:
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return payload["messages"][0]["content"]
+
+    monkeypatch.setattr(annotator_module, "acompletion", fake_acompletion)
+    responses = asyncio.run(Annotator.aannotate_many([_request(i) for i in range(10)], concurrency=3))
+    assert responses == [str(i) for i in range(10)]
+    assert peak == 3
+
+
+def test_annotate_reuses_cached_response(monkeypatch: pytest.MonkeyPatch, tmp_path: Path):
+    calls = 0
+
+    def fake_completion(**payload: Any) -> ModelResponse:
+        nonlocal calls
+        calls += 1
+        return ModelResponse(id=f"resp-{calls}", model=payload["model"])
+
+    monkeypatch.setattr(annotator_module, "completion", fake_completion)
+    first = Annotator.annotate(_request(0), cache_dir=tmp_path)
+    second = Annotator.annotate(_request(0), cache_dir=tmp_path)
+    other_model = Annotator.annotate(_request(0), model="openai/other", cache_dir=tmp_path)
+
+    other_endpoint = Annotator.annotate(_request(0), base_url="http://localhost:8000", cache_dir=tmp_path)
+
+    assert calls == 3
+    assert first.id == second.id == "resp-1"
+    assert other_model.id == "resp-2"
+    assert other_endpoint.id == "resp-3"
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_annotate_treats_corrupt_cache_entry_as_miss(monkeypatch: pytest.MonkeyPatch, tmp_path: Path):
+    monkeypatch.setattr(annotator_module, "completion", lambda **payload: ModelResponse(id="fresh", model=payload["model"]))
+    _, cache_file = annotator_module.prepare_annotation(_request(0), None, None, tmp_path)
+    assert cache_file is not None
+    cache_file.write_text('{"id": "trunc')  # left behind by an interrupted writer
+
+    assert Annotator.annotate(_request(0), cache_dir=tmp_path).id == "fresh"
+    assert json.loads(cache_file.read_text())["id"] == "fresh"
+
+
+def test_annotate_does_not_retry_bad_requests(monkeypatch: pytest.MonkeyPatch):
+    calls = 0
+
+    def fake_completion(**payload: Any) -> ModelResponse:
+        nonlocal calls
+        calls += 1
+        raise BadRequestError("invalid tool schema", model=payload["model"], llm_provider="openai")
+
+    monkeypatch.setattr(annotator_module, "completion", fake_completion)
+    with pytest.raises(BadRequestError):
+        Annotator.annotate(_request(0), max_retries=3)
+    assert calls == 1
+
+
+def _rate_limited(retry_after: str) -> RateLimitError:
+    response = httpx.Response(429, headers={"retry-after": retry_after}, request=httpx.Request("POST", "https://example.com"))
+    return RateLimitError("slow down", llm_provider="openai", model="m", response=response)
+
+
+def test_retry_delay_honors_retry_after():
+    assert retry_delay(_rate_limited("7"), attempt=0, max_retries=3) == 7.0
+    assert retry_delay(_rate_limited("86400"), attempt=0, max_retries=3) == 60.0
+    delay = retry_delay(_rate_limited("-5"), attempt=0, max_retries=3)
+    assert delay is not None and 1.0 <= delay <= 2.0
+    delay = retry_delay(RuntimeError("connection reset"), attempt=1, max_retries=3)
+    assert delay is not None and 2.0 <= delay <= 3.0
+    assert retry_delay(RuntimeError("connection reset"), attempt=2, max_retries=3) is None
+
+
+class FakeBatchAPI:
+    """Records files uploaded through litellm.create_file and batches created from them.
+
+    IDs are derived from the batch number in the upload name, so they do not depend on upload order.
+    """
+
+    def __init__(self):
+        self.uploads: list[tuple[int, bytes]] = []
+
+    def create_file(self, *, file: Any, **kwargs: Any) -> SimpleNamespace:
+        name, content = file if isinstance(file, tuple) else (file.name, file.read())
+        batch_num = int(Path(name).name.split("_")[1])
+        self.uploads.append((batch_num, content))
+        return SimpleNamespace(id=f"file-{batch_num}")
+
+    def create_batch(self, *, input_file_id: str, **kwargs: Any) -> SimpleNamespace:
+        return SimpleNamespace(id=input_file_id.replace("file-", "batch-"))
+
+
+@pytest.fixture
+def fake_batch_api(monkeypatch: pytest.MonkeyPatch) -> FakeBatchAPI:
+    api = FakeBatchAPI()
+    monkeypatch.setattr(annotator_module.litellm, "create_file", api.create_file)
+    monkeypatch.setattr(annotator_module.litellm, "create_batch", api.create_batch)
+    return api
+
+
+def test_batch_annotate_splits_by_max_requests(fake_batch_api: FakeBatchAPI, tmp_path: Path):
+    batch_ids = Annotator.batch_annotate([_request(i) for i in range(5)], tmp_path, "openai", max_requests=2)
+
+    assert batch_ids == ["batch-0", "batch-1", "batch-2"]
+    lines = [json.loads(line) for _, upload in sorted(fake_batch_api.uploads) for line in upload.splitlines()]
+    assert [line["body"]["messages"][0]["content"] for line in lines] == ["0", "1", "2", "3", "4"]
+    assert lines[0]["custom_id"] == f"req_{tmp_path.name}_00000000"
+    assert json.loads((tmp_path / "batch_000002.json").read_text())["request_count"] == 1
+    assert not list(tmp_path.glob("*_inputs.jsonl"))
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_batch_annotate_resumes_submitted_batches(fake_batch_api: FakeBatchAPI, tmp_path: Path):
+    Annotator.batch_annotate([_request(i) for i in range(3)], tmp_path, "openai", max_requests=2)
+    (tmp_path / "batch_000001.json").unlink()  # second batch never got recorded
+
+    batch_ids = Annotator.batch_annotate([_request(i) for i in range(3)], tmp_path, "openai", max_requests=2)
+
+    assert batch_ids == ["batch-0", "batch-1"]
+    assert sorted(batch_num for batch_num, _ in fake_batch_api.uploads) == [0, 1, 1]
+
+    # Same inputs against another provider or endpoint must not reuse the recorded batches
+    Annotator.batch_annotate([_request(i) for i in range(3)], tmp_path, "azure", max_requests=2)
+    Annotator.batch_annotate([_request(i) for i in range(3)], tmp_path, "azure", base_url="http://localhost:4000", max_requests=2)
+    assert len(fake_batch_api.uploads) == 7
+
+
+def test_batch_annotate_keeps_batch_order_with_concurrent_uploads(fake_batch_api: FakeBatchAPI, monkeypatch: pytest.MonkeyPatch, tmp_path: Path):
+    create_file = fake_batch_api.create_file
+    later_uploads_done = threading.Event()
+    first_upload_held = False
+
+    def hold_first_upload(*, file: Any, **kwargs: Any) -> SimpleNamespace:
+        nonlocal first_upload_held
+        if file[0].startswith("batch_000000"):
+            # Hold batch 0 until batches 1 and 2 have been uploaded
+            first_upload_held = later_uploads_done.wait(timeout=10)
+            return create_file(file=file, **kwargs)
+        uploaded = create_file(file=file, **kwargs)
+        if len(fake_batch_api.uploads) == 2:
+            later_uploads_done.set()
+        return uploaded
+
+    monkeypatch.setattr(annotator_module.litellm, "create_file", hold_first_upload)
+    batch_ids = Annotator.batch_annotate([_request(i) for i in range(3)], tmp_path, "openai", max_requests=1)
+
+    assert first_upload_held
+    assert [batch_num for batch_num, _ in fake_batch_api.uploads][-1] == 0
+    assert batch_ids == ["batch-0", "batch-1", "batch-2"]
+
+
+def test_model_override_moves_the_cache_breakpoint(fake_batch_api: FakeBatchAPI, monkeypatch: pytest.MonkeyPatch, tmp_path: Path):
+    request = ChatCompletionRequest(
+        model="openai/o3",
+        messages=[
+            {"role": "system", "content": [{"type": "text", "text": "rubric"}]},
+            {"role": "user", "content": "trace"},
+        ],
+    )
+    sent: list[dict[str, Any]] = []
+
+    def fake_completion(**payload: Any) -> ModelResponse:
+        sent.append(payload)
+        return ModelResponse(model=payload["model"])
+
+    def system_block(payload: Any) -> dict[str, Any]:
+        return payload["messages"][0]["content"][0]
+
+    monkeypatch.setattr(annotator_module, "completion", fake_completion)
+
+    Annotator.annotate(request, model="anthropic/claude-sonnet-4")
+    assert system_block(sent[0])["cache_control"] == {"type": "ephemeral"}
+    assert "cache_control" not in system_block(request)  # the caller's request is not modified
+
+    Annotator.annotate(ChatCompletionRequest(**sent[0]), model="openai/o3")
+    assert "cache_control" not in system_block(sent[1])
+
+    Annotator.batch_annotate([request], tmp_path, "openai", model="anthropic/claude-sonnet-4")
+    assert system_block(json.loads(fake_batch_api.uploads[0][1])["body"])["cache_control"] == {"type": "ephemeral"}
+
+
+def test_aget_batch_results_bounds_concurrency(monkeypatch: pytest.MonkeyPatch):
+    batches = {
+        f"batch-{i}": SimpleNamespace(id=f"batch-{i}", status="completed", created_at=0, completed_at=1, request_counts=None, error_file_id=None, output_file_id=f"file-{i}")
+        for i in range(5)
+    }
+    in_flight = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def fake_retrieve_batch(*, batch_id: str, **kwargs: Any) -> SimpleNamespace:
+        if batch_id not in batches:
+            raise KeyError(batch_id)
+        return batches[batch_id]
+
+    def fake_file_content(*, file_id: str, **kwargs: Any) -> HttpxBinaryResponseContent:
+        nonlocal in_flight, peak
+        with lock:
+            in_flight += 1
+            peak = max(peak, in_flight)
+        time.sleep(0.01)
+        with lock:
+            in_flight -= 1
+        return HttpxBinaryResponseContent(httpx.Response(200, content=f'{{"custom_id": "{file_id}"}}\n'.encode()))
+
+    monkeypatch.setattr(annotator_module.litellm, "retrieve_batch", fake_retrieve_batch)
+    monkeypatch.setattr(annotator_module.litellm, "file_content", fake_file_content)
+    outcomes = asyncio.run(Annotator.aget_batch_results([*batches, "batch-missing"], "openai", concurrency=2, return_exceptions=True))
+
+    assert peak <= 2
+    assert [outcome[1] for outcome in outcomes[:5] if isinstance(outcome, tuple)] == [[{"custom_id": f"file-{i}"}] for i in range(5)]
+    assert isinstance(outcomes[5], KeyError)
+
+
+def test_aget_batch_results_rejects_non_positive_concurrency():
+    with pytest.raises(ValueError, match="concurrency"):
+        asyncio.run(Annotator.aget_batch_results(["batch-0"], "openai", concurrency=0))
+
+
+def test_content_to_dicts_skips_blank_lines():
+    content = HttpxBinaryResponseContent(httpx.Response(200, content='{"a": 1}\n\n{"b": "é"}\n'.encode()))
+    assert content_to_dicts(content) == [{"a": 1}, {"b": "é"}]
+
+
+def test_content_to_dicts_splits_records_on_newlines_only():
+    # U+2028 is valid unescaped inside a JSON string, but str.splitlines() treats it as a line break
+    content = HttpxBinaryResponseContent(httpx.Response(200, content='{"a": "x\u2028y"}\n'.encode()))
+    assert content_to_dicts(content) == [{"a": "x\u2028y"}]